@@ -1,8 +1,11 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict
-from ortools_solver import scenario2
-import json 
+from functools import lru_cache
+from collections import defaultdict
+from ortools_solver import scenario2, path_to_datasets
+import asyncio
+import orjson
 import os 
 
 app = FastAPI()
@@ -13,14 +16,26 @@ class SolutionOutput(BaseModel):
     
 path_to_solutions = os.path.join("..", "Solutions", "sols")
 
-@app.get("/solve/{instance}")
-async def solve_problem(instance: str):
+# One lock per instance, so concurrent requests for the same instance wait for a single solve instead of repeating it
+solve_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+@lru_cache(maxsize=128)
+def load_solution(solution_file: str, mtime: float):
+    """Reads a solution file; the modification time is part of the cache key"""
+    with open(solution_file, 'rb') as f:
+        return orjson.loads(f.read())
+
+@app.get("/solve/{instance}", response_model=SolutionOutput)
+async def solve_problem(instance: str) -> SolutionOutput:
     try:        
-        scenario2(instance)
-        print(instance)
+        dataset = os.path.join(path_to_datasets, instance)
         solution_file = os.path.join(path_to_solutions, instance.replace('.txt', '.json'))
-        with open(solution_file) as f:
-            solution_data = json.load(f)
+        async with solve_locks[instance]:
+            # Solve only if there is no solution newer than the dataset
+            if not os.path.exists(solution_file) or os.path.getmtime(solution_file) < os.path.getmtime(dataset):
+                await asyncio.to_thread(scenario2, instance)
+        print(instance)
+        solution_data = load_solution(solution_file, os.path.getmtime(solution_file))
         
         return SolutionOutput(routes=solution_data['routes'], cost=solution_data['cost'])
     except Exception as e:
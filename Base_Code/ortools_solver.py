@@ -1,186 +1,235 @@
 import os,math
+import numpy as np
 from ortools.constraint_solver import pywrapcp,routing_enums_pb2
 from tqdm import tqdm
 import logging
 from time import time
-import json 
-from pydantic import BaseModel
-from typing import List
+import orjson
+from vrp_entities import Customer, Vehicle, Problem
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+import threading
 
-class Customer(BaseModel):
-    """Represents the Customer entity used for the VRPTW"""
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True, frozen=True)
+class CustomerData:
+    """Solver-side copy of a validated Customer"""
     id: int
     x: int
-    y: int 
-    demand: int 
-    ready_time: int 
+    y: int
+    demand: int
+    ready_time: int
     due_date: int
-    service_time: int 
+    service_time: int
 
-class Vehicle(BaseModel):
-    """Represents the Vehicle entity used for the VRPTW"""
-    id: int 
+@dataclass(slots=True, frozen=True)
+class VehicleData:
+    """Solver-side copy of a validated Vehicle"""
+    id: int
     capacity: int
 
-class Problem(BaseModel):
-    """Represents the Problem used for the VRPTW """
-    vehicles: List[Vehicle]
-    customers: List[Customer]
-    id: str # Instance name
-    depot: int = 0
+def travel_time_matrix(customers:List[CustomerData]) -> np.ndarray:
+    """Computes the integer travel time between every pair of customers"""
+    coordinates = np.asarray([[customer.x, customer.y] for customer in customers], dtype=np.float64)
+    diff = coordinates[:, None, :] - coordinates[None, :, :]
+    return np.rint(np.hypot(diff[..., 0], diff[..., 1])).astype(np.int64)
+
+@dataclass(slots=True)
+class ProblemData:
+    """Solver-side copy of a validated Problem, with the customer and vehicle fields also laid out as arrays"""
+    id: str
+    depot: int
+    customers: List[CustomerData]
+    vehicles: List[VehicleData]
+    demand_arr: np.ndarray
+    ready_arr: np.ndarray
+    due_arr: np.ndarray
+    service_arr: np.ndarray
+    capacity_arr: np.ndarray
+    travel_time: np.ndarray
+
+    @classmethod
+    def from_problem(cls, problem:Problem) -> 'ProblemData':
+        """Converts the pydantic Problem once, before entering the solver"""
+        customers = [CustomerData(c.id, c.x, c.y, c.demand, c.ready_time, c.due_date, c.service_time) for c in problem.customers]
+        vehicles = [VehicleData(v.id, v.capacity) for v in problem.vehicles]
+        n = len(customers)
+        return cls(
+            id=problem.id,
+            depot=problem.depot,
+            customers=customers,
+            vehicles=vehicles,
+            demand_arr=np.fromiter((customer.demand for customer in customers), np.int64, count=n),
+            ready_arr=np.fromiter((customer.ready_time for customer in customers), np.int64, count=n),
+            due_arr=np.fromiter((customer.due_date for customer in customers), np.int64, count=n),
+            service_arr=np.fromiter((customer.service_time for customer in customers), np.int64, count=n),
+            capacity_arr=np.fromiter((vehicle.capacity for vehicle in vehicles), np.int64, count=len(vehicles)),
+            travel_time=travel_time_matrix(customers)
+        )
+
+def index_to_node_table(manager:pywrapcp.RoutingIndexManager) -> np.ndarray:
+    """Maps every routing index of the manager to its node in a single array"""
+    return np.asarray([manager.IndexToNode(index) for index in range(manager.GetNumberOfIndices())], dtype=np.int64)
+                
+# Objective value, then the nodes and the arrival times of every route, as read from a routing solution
+RouteExtraction = Tuple[int, List[np.ndarray], List[np.ndarray]]
+
+def extract_routes(fsolution:pywrapcp.Assignment, model:pywrapcp.RoutingModel, manager:pywrapcp.RoutingIndexManager) -> RouteExtraction:
+    """Walks every route of the solution once and keeps its nodes and arrival times"""
+    node_of = index_to_node_table(manager)
+    routes_nodes: List[np.ndarray] = list()
+    arrival_times: List[np.ndarray] = list()
+    time_dimension = model.GetDimensionOrDie('Time')
+    for vehicle_id in range(model.vehicles()):
+        index = model.Start(vehicle_id)
+        nodes: List[int] = list()
+        times: List[int] = list()
+        while True:
+            nodes.append(node_of[index])
+            times.append(fsolution.Min(time_dimension.CumulVar(index)))
+            if model.IsEnd(index):
+                break
+            index = fsolution.Value(model.NextVar(index))
+        routes_nodes.append(np.asarray(nodes, dtype=np.int64))
+        arrival_times.append(np.asarray(times, dtype=np.int64))
+    return fsolution.ObjectiveValue(), routes_nodes, arrival_times
                 
 class Solution:
     """Generates the solution of the problem"""
-    def __init__(self, problem:Problem, fsolution, model, manager):
-        """Initiates the Solution class"""
+    def __init__(self, problem:ProblemData, objective:int, routes_nodes:List[np.ndarray], arrival_times:List[np.ndarray], log_level:int=logging.WARNING) -> None:
+        """Initiates the Solution class from the routes returned by extract_routes"""
         self.problem = problem
-        self.fsolution = fsolution
-        self.model = model
-        self.manager = manager
-        self.routes = list()
-        self.total_driving_time = 0
-        self.total_driving_service_time = 0
-        logging.basicConfig(filename=f'{os.path.join("..", "Solutions", "logs",self.problem.id.replace(".txt", ".log"))}', filemode='w', format='%(asctime)s - %(message)s', level=logging.DEBUG)
+        self.objective = objective
+        self._routes_nodes = routes_nodes
+        self._arrival_times = arrival_times
+        self.routes: List[List[int]] = list()
+        self.total_driving_time: int = 0
+        self.total_driving_service_time: int = 0
+        self.log_level = log_level
+        self.logger = logger.getChild(self.problem.id.replace(".txt", ""))
+        self.logger.propagate = False
+        # The level is filtered on the handler; the logger is only ever lowered, so that a solve of the same instance
+        # at another level is not affected
+        if not self.logger.isEnabledFor(log_level):
+            self.logger.setLevel(log_level)
+        # The log file is only opened (and overwritten) once something is logged at the requested level
+        self._log_handler = logging.FileHandler(os.path.join("..", "Solutions", "logs", self.problem.id.replace(".txt", ".log")), mode='w', delay=True)
+        self._log_handler.setLevel(log_level)
+        self._log_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+        self.logger.addHandler(self._log_handler)
         
-    def print_solution(self):
+    def print_solution(self) -> None:
         """Prints the solution of the problem to the console"""
-        print(f"Objective: {self.fsolution.ObjectiveValue()}")
-        time_dimension = self.model.GetDimensionOrDie('Time')
-        for vehicle_id in range(len(self.problem.vehicles)):
-            index = self.model.Start(vehicle_id)
+        print(f"Objective: {self.objective}")
+        self.total_driving_time = 0
+        for vehicle_id, (nodes, times) in enumerate(zip(self._routes_nodes, self._arrival_times)):
             plan_output = f"Route for vehicle {vehicle_id}:\n"
-            route_load = 0
-            while not self.model.IsEnd(index):
-                time_var = time_dimension.CumulVar(index)
-                plan_output += f'{self.manager.IndexToNode(index)}(Load({self.problem.customers[self.manager.IndexToNode(index)].demand})) -> '
-                route_load += self.problem.customers[self.manager.IndexToNode(index)].demand
-                index = self.fsolution.Value(self.model.NextVar(index))
-            time_var = time_dimension.CumulVar(index)
-            plan_output += f'{self.manager.IndexToNode(index)}\n'
-            plan_output += f'Time of the route: {self.fsolution.Min(time_var)} seconds\n'
-            plan_output += f'Load of the route: {route_load}\n'
+            for node in nodes[:-1]:
+                plan_output += f'{node}(Load({self.problem.demand_arr[node]})) -> '
+            plan_output += f'{nodes[-1]}\n'
+            plan_output += f'Time of the route: {times[-1]} seconds\n'
+            plan_output += f'Load of the route: {self.problem.demand_arr[nodes[:-1]].sum()}\n'
             print(plan_output)
-            self.total_driving_time += self.fsolution.Min(time_var)
+            self.total_driving_time += int(times[-1])
         
         print('Total time of all routes: {0:.3f} seconds'.format(self.total_driving_time))   
         print(f"Cost evaluation: {self.evaluate_cost()}")
         
-    def get_routes(self):
+    def get_routes(self) -> List[List[int]]:
         """Get vehicle routes from a solution and store them in an list of lists"""
-        for route_nbr in range(self.model.vehicles()):
-            index = self.model.Start(route_nbr)
-            route = [self.manager.IndexToNode(index)]
-            while not self.model.IsEnd(index):
-                index = self.fsolution.Value(self.model.NextVar(index))
-                route.append(self.manager.IndexToNode(index))
-            self.routes.append(route)
+        self.routes = [nodes.tolist() for nodes in self._routes_nodes]
         return self.routes
     
-    def evaluate_cost(self):
+    def evaluate_cost(self) -> int:
         """ Computes the cost of all the deliveries.
             Considers driving time to each client from depot and back, and service time of each client."""
-        driving_time = 0
-        service_time = 0
+        driving_time: int = 0
+        service_time: int = 0
 
-        time_dimension = self.model.GetDimensionOrDie('Time')
-        for vehicle_id in range(len(self.problem.vehicles)):
-            index = self.model.Start(vehicle_id)
-            while not self.model.IsEnd(index):
-                time_var = time_dimension.CumulVar(index)
-                index = self.fsolution.Value(self.model.NextVar(index))
-                driving_time += self.fsolution.Min(time_var)
-                service_time += self.problem.customers[self.manager.IndexToNode(index)].service_time
-            time_var = time_dimension.CumulVar(index)
-            driving_time += self.fsolution.Min(time_var)        
+        for nodes, times in zip(self._routes_nodes, self._arrival_times):
+            driving_time += int(times.sum())
+            service_time += int(self.problem.service_arr[nodes[1:]].sum())
         self.total_driving_service_time = driving_time + service_time
 
         return self.total_driving_service_time
     
-    def feasible(self):
+    def feasible(self) -> bool:
         """ Check if the total capacity of the route is less or equal of the capacity of the vehicle.
             Check for the time of the route.
             Check for the time windows of the visited customers.
         """
-        logging.info(f"~~~~~~ Instance: {str(self.problem.id)} ~~~~~")
+        self.logger.info("~~~~~~ Instance: %s ~~~~~", self.problem.id)
 
-        # Check for the capacity of each route 
-        for vehicle_id in range(self.model.vehicles()):
-            capacity_of_route = 0
-            index = self.model.Start(vehicle_id)
-            logging.info(f"Starting capacity check for route {vehicle_id}")
-            while not self.model.IsEnd(index):
-                capacity_of_route += self.problem.customers[self.manager.IndexToNode(index)].demand
-                index = self.fsolution.Value(self.model.NextVar(index))
+        # All routes concatenated without their end node, and where each route starts
+        visits = [nodes[:-1] for nodes in self._routes_nodes]
+        route_starts = np.cumsum([0] + [len(nodes) for nodes in visits[:-1]])
+        all_nodes = np.concatenate(visits)
+        arrival = np.concatenate([times[:-1] for times in self._arrival_times])
 
-            if capacity_of_route <= self.problem.vehicles[0].capacity:
-                logging.info(f"Capacity check for route {str(vehicle_id)} --> OK")
-            else:
-                logging.warning(f"Capacity check for route {str(vehicle_id)} --> NOT OK")
-                return False
+        # Check for the capacity of each route 
+        capacity_met = np.add.reduceat(self.problem.demand_arr[all_nodes], route_starts) <= self.problem.capacity_arr
+        if not capacity_met.all():
+            self.logger.warning("Capacity check for route %s --> NOT OK", int(np.argmin(capacity_met)))
+            return False
+        self.logger.info("Capacity checks for all routes --> OK")
         
-        # Check for the time windows of clients of each route
-        time_dimension = self.model.GetDimensionOrDie('Time')
-        for vehicle_id in range(len(self.problem.vehicles)):
-            index = self.model.Start(vehicle_id)
-            logging.info(f"Starting time window checks for route {vehicle_id}")
-            while not self.model.IsEnd(index):
-                if self.manager.IndexToNode(index) == self.problem.depot:
-                    index = self.fsolution.Value(self.model.NextVar(index))
-                else:
-                    time_var = time_dimension.CumulVar(index)
-                    time_window_arrive = self.fsolution.Min(time_var)
-
-                    if self.problem.customers[self.manager.IndexToNode(index)].ready_time <= time_window_arrive <= self.problem.customers[self.manager.IndexToNode(index)].due_date:
-                        logging.info(f"\tTime window of client {str(self.manager.IndexToNode(index))} met --> OK ")
-                    else:
-                        logging.warning(f"\tTime window of client {str(self.manager.IndexToNode(index-1))} not met --> NOT OK")
-                        return False
-                    index = self.fsolution.Value(self.model.NextVar(index))
-            logging.info(f"Time window checks for route {vehicle_id} met --> OK")
-        logging.info(f"~~ Cost of solution: {self.evaluate_cost()}")
-        logging.info("\n")
+        # Check for the time windows of clients of each route, the depot has none
+        time_window_met = ((self.problem.ready_arr[all_nodes] <= arrival) & (arrival <= self.problem.due_arr[all_nodes])) | (all_nodes == self.problem.depot)
+        if not time_window_met.all():
+            self.logger.warning("\tTime window of client %s not met --> NOT OK", all_nodes[np.argmin(time_window_met)])
+            return False
+        self.logger.info("Time window checks for all routes --> OK")
+        if self.log_level <= logging.INFO:
+            self.logger.info("~~ Cost of solution: %s", self.evaluate_cost())
+            self.logger.info("\n")
         
         return True
     
-    def save_to_file(self):
+    def close(self) -> None:
+        """Detaches and closes the log file of the solution"""
+        self.logger.removeHandler(self._log_handler)
+        self._log_handler.close()
+
+    def save_to_file(self) -> None:
         """Saves the routes of the solution to a file"""
-        data = {
+        data: Dict[str, Any] = {
             'routes': [],
             'cost': int
         }
         
-        with open(os.path.join('..', 'Solutions', 'sols', self.problem.id.replace(".txt", ".json")), 'w') as f:
-            for vehicle_id, customers in enumerate(self.routes):
-                route = {
-                    'vehicle': vehicle_id,
-                    'route': customers
-                }
-                data['routes'].append(route)   
-            data['cost'] = self.evaluate_cost()
-            
-            json.dump(data, f, indent=4)
-
-class Callback:
-    def __init__(self, data:Problem, mn): 
-        self.data = data
-        self.manager = mn
+        for vehicle_id, customers in enumerate(self.routes):
+            route = {
+                'vehicle': vehicle_id,
+                'route': customers
+            }
+            data['routes'].append(route)   
+        data['cost'] = self.evaluate_cost()
+        
+        write_json(data, os.path.join('..', 'Solutions', 'sols', self.problem.id.replace(".txt", ".json")))
 
-    def time_callback(self, from_index, to_index):
-        from_node = self.manager.IndexToNode(from_index)
-        to_node = self.manager.IndexToNode(to_index)
-        return self.data.G[from_node][to_node]['weight']
-    
-    def demand_callback(self, from_index):
-        from_node = self.manager.IndexToNode(from_index)
-        return self.data.customers[from_node].demand
+# First solution strategies raced against each other by vehicle_routing_solver
+PORTFOLIO = (
+    routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC,
+    routing_enums_pb2.FirstSolutionStrategy.SAVINGS,
+    routing_enums_pb2.FirstSolutionStrategy.CHRISTOFIDES,
+    routing_enums_pb2.FirstSolutionStrategy.PARALLEL_CHEAPEST_INSERTION,
+)
 
-def  vehicle_routing_solver(data:Problem):
+def _solve_with(data:ProblemData, strategy:int, time_limit:int) -> Optional[RouteExtraction]:
+    """Builds the routing model of the problem and solves it starting from the given first solution strategy"""
     manager = pywrapcp.RoutingIndexManager(len(data.customers), len(data.vehicles), data.depot)
     model = pywrapcp.RoutingModel(manager)
-    cb = Callback(data, manager)
+    idx_of_node = [manager.NodeToIndex(customer_id) for customer_id in range(len(data.customers))]
+    start_idx = [model.Start(vehicle_id) for vehicle_id in range(len(data.vehicles))]
+    end_idx = [model.End(vehicle_id) for vehicle_id in range(len(data.vehicles))]
     
-    transit_callback_index = model.RegisterTransitCallback(cb.time_callback)
-    demand_callback_index = model.RegisterUnaryTransitCallback(cb.demand_callback)
+    # Registered as plain matrices, so the search never calls back into Python
+    transit_callback_index = model.RegisterTransitMatrix(data.travel_time.tolist())
+    demand_callback_index = model.RegisterUnaryTransitVector(data.demand_arr.tolist())
 
     model.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
     model.AddDimensionWithVehicleCapacity(
@@ -201,7 +250,7 @@ def  vehicle_routing_solver(data:Problem):
     # Add time-window constraint
     time_dimension = model.GetDimensionOrDie('Time')
     for customer_id in range(len(data.customers)):
-        index = manager.NodeToIndex(customer_id)
+        index = idx_of_node[customer_id]
         if customer_id == data.depot:
             time_dimension.SlackVar(index).SetValue(data.customers[data.depot].service_time)
             continue
@@ -210,90 +259,142 @@ def  vehicle_routing_solver(data:Problem):
     
     # Add constraint from depot 
     for vehicle_id in range(len(data.vehicles)):
-        index = model.Start(vehicle_id)
+        index = start_idx[vehicle_id]
         time_dimension.CumulVar(index).SetRange(data.customers[data.depot].ready_time, data.customers[data.depot].due_date)
     
     for vehicle_id in range(len(data.vehicles)):
-        model.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(model.Start(vehicle_id)))
-        model.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(model.End(vehicle_id)))
+        model.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(start_idx[vehicle_id]))
+        model.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(end_idx[vehicle_id]))
         
     search_parameters = pywrapcp.DefaultRoutingSearchParameters()
-    search_parameters.first_solution_strategy = (routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC)
-    search_parameters.time_limit.seconds = 300
+    search_parameters.first_solution_strategy = strategy
+    search_parameters.local_search_metaheuristic = (routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
+    search_parameters.local_search_operators.use_cross_exchange = pywrapcp.BOOL_TRUE
+    search_parameters.local_search_operators.use_relocate_neighbors = pywrapcp.BOOL_TRUE
+    search_parameters.local_search_operators.use_or_opt = pywrapcp.BOOL_TRUE
+    search_parameters.use_full_propagation = False
+    search_parameters.time_limit.FromSeconds(time_limit)
     solution = model.SolveWithParameters(search_parameters)
     
     if solution:
-        sol = Solution(data, solution, model, manager)
-        sol.feasible()
-        sol.print_solution()
-        _ = sol.get_routes()
-        sol.save_to_file()
+        return extract_routes(solution, model, manager)
+    return None
+
+def _solve_in_worker(problem:Problem, strategy:int, time_limit:int) -> Optional[RouteExtraction]:
+    """Runs _solve_with inside a worker process of vehicle_routing_solver"""
+    return _solve_with(ProblemData.from_problem(problem), strategy, time_limit)
+
+_strategy_pool: Optional[ProcessPoolExecutor] = None
+_strategy_pool_lock = threading.Lock()
+
+def strategy_pool() -> ProcessPoolExecutor:
+    """Returns the process pool shared by all portfolio races, so concurrent solves (e.g. from /solve) never run more
+       searches than there are cores. Workers are not forked, since the caller may be a thread of a running server."""
+    global _strategy_pool
+    with _strategy_pool_lock:
+        if _strategy_pool is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _strategy_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context(start_method))
+        return _strategy_pool
+
+def  vehicle_routing_solver(problem:Problem, strategies:Sequence[int] = PORTFOLIO, workers:Optional[int] = None, log_level:int = logging.WARNING) -> None:
+    data = ProblemData.from_problem(problem)
+    # Guided local search only stops on the time limit, so it is scaled with the size of the instance
+    time_limit = 16 if len(data.customers) <= 200 else 60
+    # The routing search is single-threaded, so each strategy gets its own process and the best solution is kept.
+    # With fewer workers than strategies the time limit is shared, keeping the wall-clock of a single search.
+    workers = min(len(strategies), workers or os.cpu_count() or 1)
+    strategy_time_limit = max(1, time_limit * workers // len(strategies))
+    if workers == 1:
+        solutions = [_solve_with(data, strategy, strategy_time_limit) for strategy in strategies]
+    else:
+        executor = strategy_pool()
+        futures = [executor.submit(_solve_in_worker, problem, strategy, strategy_time_limit) for strategy in strategies]
+        solutions = [future.result() for future in futures]
+    found = [solution for solution in solutions if solution is not None]
+    
+    if found:
+        sol = Solution(data, *min(found, key=lambda solution: solution[0]), log_level=log_level)
+        try:
+            sol.feasible()
+            sol.print_solution()
+            _ = sol.get_routes()
+            sol.save_to_file()
+        finally:
+            sol.close()
     else:
         print("Solution failed to be constructed")
 
-def solomon_to_json(input_file):
-    """Function to convert dataset instance to json format for handling by Pydantic class objects"""
-    data = {
+def write_json(data:Dict[str, Any], output_file:str) -> None:
+    """Writes data to a json file"""
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+def solomon_to_dict(input_file:str) -> Dict[str, Any]:
+    """Function to convert dataset instance to a dict in the format expected by the Pydantic class objects"""
+    data: Dict[str, Any] = {
         'vehicles': [],
         'customers': []
     }
     
     with open(input_file, 'r') as f:
-        lines = f.readlines()
-        vehicle_count, vehicle_capacity = lines[4].split()
+        header = [f.readline() for _ in range(9)]
+        rows = np.loadtxt(f, dtype=np.int64, ndmin=2)
+    vehicle_count, vehicle_capacity = header[4].split()
 
-        for line in lines[9:]:
-            parts = line.split()
-            customer = {
-                'id': int(parts[0]),
-                'x': int(parts[1]),
-                'y': int(parts[2]),
-                'demand': int(parts[3]),
-                'ready_time': int(parts[4]),
-                'due_date': int(parts[5]),
-                'service_time': int(parts[6])
-            }
-            data['customers'].append(customer)
-        
-        for i in range(int(vehicle_count)):
-            vehicle = {
-                'id': i,
-                'capacity': int(vehicle_capacity)
-            }
-            data['vehicles'].append(vehicle)
+    fields = ('id', 'x', 'y', 'demand', 'ready_time', 'due_date', 'service_time')
+    data['customers'] = [dict(zip(fields, row)) for row in rows.tolist()]
     
+    for i in range(int(vehicle_count)):
+        vehicle = {
+            'id': i,
+            'capacity': int(vehicle_capacity)
+        }
+        data['vehicles'].append(vehicle)
+    
+    return data
+
+def solomon_to_json(input_file:str) -> str:
+    """Function to convert dataset instance to json format for handling by Pydantic class objects"""
     output_file = input_file.replace('.txt', '.json')
-    with open(output_file, 'w') as f:
-        json.dump(data, f, indent=4)
+    write_json(solomon_to_dict(input_file), output_file)
     
     return output_file
 
 path_to_datasets = os.path.join("..", "Datasets")
 
-def scenario1():
+@lru_cache(maxsize=128)
+def load_problem(instance:str, mtime:float) -> Problem:
+    """Loads an instance of the datasets directory as a Problem.
+       The modification time of the dataset is part of the cache key, so edited datasets are parsed again."""
+    dataset = os.path.join(path_to_datasets, instance)
+    data = solomon_to_dict(dataset)
+    return Problem(vehicles=data['vehicles'], customers=data['customers'], id=dataset.split(f'{os.sep}')[-1])
+
+def _solve_one(instance:str, log_level:int = logging.WARNING) -> None:
+    """Solves a single instance of the datasets directory; runs inside a worker process of scenario1"""
+    dataset = os.path.join(path_to_datasets, instance)
+    problem = load_problem(instance, os.path.getmtime(dataset))
+    # scenario1 already runs one instance per core, so the strategies of the portfolio run one after the other here
+    vehicle_routing_solver(problem, workers=1, log_level=log_level)
+
+def scenario1(log_level:int = logging.WARNING) -> None:
     time_start = time()
     
-    for instance in tqdm(os.listdir(path_to_datasets)):
-        if instance.endswith(".txt"):
-            dataset = os.path.join(path_to_datasets, instance)
-            dataset_json = solomon_to_json(dataset)
-
-            with open(dataset_json) as f:
-                data = json.load(f)
-            problem = Problem(vehicles=data['vehicles'], customers=data['customers'], id=dataset.split(f'{os.sep}')[-1])
-            vehicle_routing_solver(problem)
+    instances = [instance for instance in os.listdir(path_to_datasets) if instance.endswith(".txt")]
+    # Every instance is an independent, CPU-bound solve, so they are spread over processes
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [executor.submit(_solve_one, instance, log_level) for instance in instances]
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            future.result()
     
     time_end = time()
     print(f"Time elapsed: {str(time_end - time_start)}")
 
-def scenario2(instance = "C101.txt"):
+def scenario2(instance:str = "C101.txt", log_level:int = logging.WARNING) -> None:
     dataset = os.path.join(path_to_datasets, instance)
-    dataset_json = solomon_to_json(dataset)
-
-    with open(dataset_json) as f:
-        data = json.load(f)
-    problem = Problem(vehicles=data['vehicles'], customers=data['customers'], id=dataset.split(f'{os.sep}')[-1])
-    vehicle_routing_solver(problem)
+    problem = load_problem(instance, os.path.getmtime(dataset))
+    vehicle_routing_solver(problem, log_level=log_level)
         
 if __name__ == "__main__":
     # scenario1()
@@ -0,0 +1,8 @@
+"""Optional mypyc build of the solver module, see the README"""
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name='vrptw-solver',
+    ext_modules=mypycify(['--ignore-missing-imports', 'ortools_solver.py']),
+)
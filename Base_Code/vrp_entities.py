@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List
+
+class Customer(BaseModel):
+    """Represents the Customer entity used for the VRPTW"""
+    id: int
+    x: int
+    y: int 
+    demand: int 
+    ready_time: int 
+    due_date: int
+    service_time: int 
+
+class Vehicle(BaseModel):
+    """Represents the Vehicle entity used for the VRPTW"""
+    id: int 
+    capacity: int
+
+class Problem(BaseModel):
+    """Represents the Problem used for the VRPTW """
+    vehicles: List[Vehicle]
+    customers: List[Customer]
+    id: str # Instance name
+    depot: int = 0
@@ -1,4 +1,5 @@
 import os,math
+import numpy as np
 import tkinter as tk
 from tkinter import filedialog
 from itertools import product
@@ -8,16 +9,17 @@ import docplex.mp.context as cpx
 class Customer:
     def __init__(self,customer_id,customer_xcoord,customer_ycoord,customer_demand,customer_ready_time,customer_due_date,customer_service_time):
         self.id=customer_id
-        self.coordinates={"x":customer_xcoord,"y":customer_ycoord}
+        self.x=customer_xcoord
+        self.y=customer_ycoord
         self.demand=customer_demand
         self.ready_time=customer_ready_time
         self.due_date=customer_due_date
         self.service_time=customer_service_time
     
     def distance(self,other_customer):
-        return math.sqrt(math.pow(other_customer.coordinates['x']-self.coordinates['x'], 2) + math.pow(other_customer.coordinates['y']-self.coordinates['y'], 2))
+        return math.hypot(other_customer.x-self.x, other_customer.y-self.y)
     def __str__(self):
-        return f"{self.id},({self.coordinates['x']},{self.coordinates['y']}),{self.demand},{self.ready_time},{self.due_date},{self.service_time}"
+        return f"{self.id},({self.x},{self.y}),{self.demand},{self.ready_time},{self.due_date},{self.service_time}"
 
 class Problem:
     path_to_datasets = os.path.join("..", "Datasets")
@@ -43,159 +45,117 @@ class Problem:
         self.depot=None
 
         with open(os.path.join(self.path_to_datasets,dataset_name),'r') as reader:
-            for row_counter,line in enumerate(reader):
-                if row_counter==4:
-                    self.vehicles, self.capacity = [int(x) for x in line.strip().split()]
+            lines=reader.readlines()
 
-                if row_counter<=skiprows:
-                    continue
-                
-                if line.strip()=="": 
-                    continue
-                
-                data = line.strip().split()
-                
-                if len(data)!=7: 
-                    continue
-                
-                self.customers.append(Customer(int(data[0]),int(data[1]),int(data[2]),int(data[3]),int(data[4]),int(data[5]),int(data[6])))
+        self.vehicles, self.capacity = [int(x) for x in lines[4].strip().split()]
+        rows=np.loadtxt(lines[max(9,skiprows+1):],dtype=np.int64,ndmin=2)
+        self.customers=[Customer(*row) for row in rows.tolist()]
 
         self.depot = self.customers[0]
         self.customers.append(self.depot)
 
-        self.travel_time={i:{j:self.customers[i].distance(self.customers[j])+self.customers[i].service_time if i!=j else 0 for j in range(self.no_customers())} for i in range(self.no_customers())}
+        coordinates=np.asarray([[customer.x,customer.y] for customer in self.customers],dtype=np.float64)
+        service_times=np.asarray([customer.service_time for customer in self.customers],dtype=np.float64)
+        diff=coordinates[:,None,:]-coordinates[None,:,:]
+        self.travel_time=np.hypot(diff[...,0],diff[...,1])+service_times[:,None]
+        np.fill_diagonal(self.travel_time,0.0)
 
     def no_customers(self):
         return len(self.customers)
     
-    def statistics(self):        
-        avg_demand = 0.0
-        avg_service_time = 0.0
-        avg_time_window = 0.0
-        for customer in self.customers:
-            avg_demand += customer.demand
-            avg_service_time += customer.service_time
-            avg_time_window += (customer.due_date - customer.ready_time)
-        avg_demand /= self.no_customers()
-        avg_service_time /= self.no_customers()
-        avg_time_window /= self.no_customers()     
-        
-        stdev_demand = 0.0
-        stdev_service_time = 0.0
-        stdev_time_window = 0.0
-        temp_sum_demand = 0.0
-        temp_sum_service_time = 0.0
-        temp_sum_time_window = 0.0
-        for customer in self.customers:
-            temp_sum_demand += math.pow(customer.demand - avg_demand, 2)
-            temp_sum_service_time += math.pow(customer.service_time - avg_service_time, 2)
-            temp_sum_time_window += math.pow((customer.due_date - customer.ready_time) - avg_time_window, 2)
-        stdev_demand += math.sqrt(temp_sum_demand, self.no_customers())   
-        stdev_service_time += math.sqrt(temp_sum_service_time, self.no_customers())
-        stdev_time_window += math.sqrt(temp_sum_time_window, self.no_customers())
+    def statistics(self):
+        demand=np.fromiter((customer.demand for customer in self.customers),np.float64,count=self.no_customers())
+        service_time=np.fromiter((customer.service_time for customer in self.customers),np.float64,count=self.no_customers())
+        time_window=np.fromiter((customer.due_date-customer.ready_time for customer in self.customers),np.float64,count=self.no_customers())
+        return {
+            'avg_demand':float(demand.mean()),
+            'stdev_demand':float(demand.std()),
+            'avg_service_time':float(service_time.mean()),
+            'stdev_service_time':float(service_time.std()),
+            'avg_time_window':float(time_window.mean()),
+            'stdev_time_window':float(time_window.std())
+        }
     
 def solve_vrptw_cplex(problem:Problem,timelimit):
     context = cpx.Context.make_default_context()
     context.cplex_parameters.threads = 4
     model = mpx.Model(name = 'VRPModel', context=context)
     
-    C = range(1,problem.no_customers()-1)
-    xvars = {(i,j,v):model.binary_var(name = f'c{str(i)}_c{str(j)}_v{str(v)}') for i in range(problem.no_customers()) for j in range(problem.no_customers()) for v in range(problem.vehicles)}
-    service_time={(i,v):model.integer_var(lb=problem.customers[i].ready_time,ub=problem.customers[i].due_date) for i in range(problem.no_customers()) for v in range(problem.vehicles)}
-
-    # 1. In each arc only a route should be applied
-    for i in C:
-        model.add(
-            sum([
-                xvars[(i,j,v)]
-                for j in range(problem.no_customers())
-                for v in range(problem.vehicles)
-            ])==1
-        )
-    
-    # 2. No customer can loop into itself
+    # The fleet is homogeneous, so arcs are not indexed by vehicle; routes are numbered when the solution is read.
+    # Arcs into the depot (0), out of the termination node (N-1), loops and the empty depot->termination arc are never created.
+    N = problem.no_customers()
+    V = problem.vehicles
+    C = range(1,N-1)
+    demand = [customer.demand for customer in problem.customers]
+    arcs = [(i,j) for i,j in product(range(N-1),range(1,N)) if i!=j and (i,j)!=(0,N-1)]
+    outgoing = {i:[] for i in range(N)}
+    incoming = {j:[] for j in range(N)}
+    for (i,j) in arcs:
+        outgoing[i].append(j)
+        incoming[j].append(i)
+
+    xvars = model.binary_var_dict(arcs, name = lambda arc: f'c{str(arc[0])}_c{str(arc[1])}')
+    service_time={i:model.integer_var(lb=problem.customers[i].ready_time,ub=problem.customers[i].due_date) for i in range(N)}
+    load=model.continuous_var_dict(range(N),lb=0,ub=problem.capacity)
+
+    # 1. Every customer is left exactly once
     for i in C:
         model.add(
-            sum([
-                xvars[(i,i,v)]
-                for v in range(problem.vehicles)
-            ])==0
+            model.sum(
+                xvars[(i,j)]
+                for j in outgoing[i]
+            )==1
         )
 
-    # Depot and termination node constraints
+    # 2. At most one route per available vehicle leaves the depot
     model.add(
-        sum([
-            xvars[(i,0,v)] 
-            for i in range(problem.no_customers()) 
-            for v in range(problem.vehicles)
-            ])==0
-        )
+        model.sum(
+            xvars[(0,j)]
+            for j in outgoing[0]
+        )<=V
+    )
+
+    # 3. Capacity constraint (MTZ load propagation, also eliminates subtours)
+    model.add_constraints(
+        load[j]>=load[i]+demand[j]-problem.capacity*(1-xvars[(i,j)])
+        for (i,j) in arcs
+    )
     
-    model.add(
-        sum([
-            xvars[(problem.no_customers()-1,j,v)] 
-            for j in range(problem.no_customers()) 
-            for v in range(problem.vehicles)
-            ])==0
-        )
-
-    # 3. Capacity constraint
-    for v in range(problem.vehicles):
-        model.add(  ## Addition 1/9/2023
-            sum([
-                xvars[(i,j,v)] * problem.customers[i].demand
-                for i in range(problem.no_customers())
-                for j in range(problem.no_customers())
-            ])<=problem.capacity
-        )
-        
-    # 4. All vehicles must start from depot
-    for v in range(problem.vehicles):
+    # 4. Incoming and Outcoming vertices
+    for cid in C:
         model.add(
-            sum([
-                xvars[(0,j,v)]
-                for j in range(problem.no_customers())
-            ])==1
+            model.sum(
+                xvars[(i,cid)]
+                for i in incoming[cid]
+            )-model.sum(
+                xvars[(cid,j)]
+                for j in outgoing[cid]
+            )==0
         )
-    
-    # 5. Incoming and Outcoming vertices
-    for v in range(problem.vehicles):
-        for cid in C:
-            model.add(
-                sum([
-                    xvars[(i,cid,v)]
-                    for i in range(problem.no_customers())
-                ])-sum([
-                    xvars[(cid,j,v)]
-                    for j in range(problem.no_customers())
-                ])==0
-            )
-
-    # 6. Every vehicle should visit the arrival node
-    for v in range(problem.vehicles):
-        model.add(
-            sum([
-                xvars[(i,problem.no_customers()-1,v)]
-                for i in range(problem.no_customers())
-            ])==1
+
+    # 5. Every route that leaves the depot reaches the arrival node
+    model.add(
+        model.sum(
+            xvars[(i,N-1)]
+            for i in incoming[N-1]
+        )==model.sum(
+            xvars[(0,j)]
+            for j in outgoing[0]
         )
+    )
     
-    # 7. Time window constraint
-    for i in range(problem.no_customers()):
-        for j in range(problem.no_customers()):
-            for v in range(problem.vehicles):
-                model.add(
-                    # service_time[(i,v)]+problem.travel_time[i][j]-K*(1-xvars[(i,j,v)])<=service_time[(j,v)]
-                    xvars[(i,j,v)] * (service_time[(i,v)] + problem.travel_time[i][j] - service_time[(j,v)]) <= 0
-                )
-
-    # 8. Objective
-    objective=sum([
-        problem.customers[i].distance(problem.customers[j]) * xvars[(i,j,v)]
-        for i in range(problem.no_customers())
-        for j in range(problem.no_customers())
-        for v in range(problem.vehicles)
-    ])
+    # 6. Time window constraint
+    big_m=float(max(customer.due_date for customer in problem.customers)+problem.travel_time.max())
+    model.add_constraints(
+        service_time[j]>=service_time[i]+problem.travel_time[i,j]-big_m*(1-xvars[(i,j)])
+        for (i,j) in arcs
+    )
+
+    # 7. Objective
+    objective=model.sum(
+        problem.customers[i].distance(problem.customers[j]) * xvars[(i,j)]
+        for (i,j) in arcs
+    )
 
     model.minimize(objective)
     model.print_information()
@@ -204,9 +164,15 @@ def solve_vrptw_cplex(problem:Problem,timelimit):
     
     solution={}
     if solution_model:
-        for (i,j,v) in list(product(range(problem.no_customers()),range(problem.no_customers()),range(problem.vehicles))):
-            if model.solution.get_value(xvars[(i,j,v)])==1:
-                solution[(i,j)]=v
+        values=solution_model.get_values([xvars[arc] for arc in arcs])
+        selected=[arc for arc,value in zip(arcs,values) if value>0.5]
+        successor={i:j for (i,j) in selected if i!=0}
+        for v,first in enumerate(j for (i,j) in selected if i==0):
+            solution[(0,first)]=v
+            i=first
+            while i!=N-1:
+                solution[(i,successor[i])]=v
+                i=successor[i]
                 
     return solution,model.objective_value
 